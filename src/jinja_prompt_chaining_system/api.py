@@ -15,11 +15,15 @@ from .parser import LLMQueryExtension
 from .logger import RunLogger
 from .utils import RelativePathFileSystemLoader
 
-def create_environment(template_path=None) -> Environment:
-    """Create a Jinja environment with the LLMQuery extension registered."""
+def create_environment(template_path=None, cwd=None) -> Environment:
+    """Create a Jinja environment with the LLMQuery extension registered.
+    
+    Non-relative includes missing from ``template_path`` are looked up in
+    ``cwd``, which defaults to the process working directory.
+    """
     # Create environment with basic settings
     env = Environment(
-        loader=RelativePathFileSystemLoader(template_path) if template_path else None,
+        loader=RelativePathFileSystemLoader(template_path, cwd=cwd) if template_path else None,
         enable_async=True,  # Enable async support for potential future use
         extensions=[LLMQueryExtension],
         autoescape=False  # Disable HTML escaping by default
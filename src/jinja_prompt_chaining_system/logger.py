@@ -1,10 +1,19 @@
+import io
 import os
-import time
 import yaml
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
 
+# Clock used for log timestamps; tests can monkeypatch this instead of the datetime class
+_now = datetime.now
+
+def _path_timestamp(dt: datetime) -> str:
+    """Format dt as YYYY-MM-DDTHH-MM-SS-ffffff for use in file and directory names."""
+    # Built from the fields directly; strftime has to parse its format string on every call
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}"
+            f"T{dt.hour:02d}-{dt.minute:02d}-{dt.second:02d}-{dt.microsecond:06d}")
+
 class ContentAwareYAMLDumper(yaml.SafeDumper):
     """
     A custom YAML dumper that uses the pipe (|) style for all content fields and multiline strings.
@@ -22,12 +31,7 @@ class ContentAwareYAMLDumper(yaml.SafeDumper):
     manual formatting or other YAML libraries like ruamel.yaml may be needed.
     """
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Register specialized representers
-        self.add_representer(str, self.represent_str_for_content)
-    
-    def represent_str_for_content(self, tag, value):
+    def represent_str_for_content(self, value):
         """Custom string representer that forces pipe style for content fields"""
         # Check if this string is a value for a content field
         if hasattr(self, '_serializer') and hasattr(self._serializer, 'path'):
@@ -47,6 +51,13 @@ class ContentAwareYAMLDumper(yaml.SafeDumper):
         # Default string representation for other cases
         return super().represent_scalar('tag:yaml.org,2002:str', value)
 
+# Registered once on the class; registering in __init__ re-ran add_representer for every yaml.dump call
+ContentAwareYAMLDumper.add_representer(str, ContentAwareYAMLDumper.represent_str_for_content)
+
+def _dump_yaml(data: Any) -> str:
+    """Dump data with ContentAwareYAMLDumper to a string so the caller can write it in one call."""
+    return yaml.dump(data, Dumper=ContentAwareYAMLDumper, default_flow_style=False, sort_keys=False, allow_unicode=True)
+
 class LLMLogger:
     """Logger for LLM interactions that saves to YAML files."""
     
@@ -69,7 +80,7 @@ class LLMLogger:
             return None
         
         # Get timestamp with microsecond precision
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H-%M-%S-%f")
+        timestamp = _path_timestamp(_now(timezone.utc))
         
         # Add a counter to ensure uniqueness even for extremely close calls
         if template_name not in self.log_counters:
@@ -78,9 +89,6 @@ class LLMLogger:
         counter = self.log_counters[template_name]
         self.log_counters[template_name] += 1
         
-        # Sleep a tiny bit to ensure different timestamp when test runs are extremely fast
-        time.sleep(0.001)
-        
         # Include counter in filename to ensure uniqueness
         filename = f"{template_name}_{timestamp}_{counter}.log.yaml"
         return os.path.join(self.log_dir, filename)
@@ -89,8 +97,6 @@ class LLMLogger:
         """
         Post-process the YAML file to change content field formatting without disturbing
         the actual YAML structure or content values.
-        
-        Uses line-by-line processing instead of regex for more reliable formatting.
         """
         if not os.path.exists(file_path):
             return
@@ -99,6 +105,16 @@ class LLMLogger:
         with open(file_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
         
+        # Write the processed content back to the file
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.writelines(self._post_process_yaml_lines(lines))
+    
+    def _post_process_yaml_lines(self, lines: List[str]) -> List[str]:
+        """
+        Add markdown comments to the content fields of dumped YAML lines.
+        
+        Uses line-by-line processing instead of regex for more reliable formatting.
+        """
         # Process lines to add markdown comments
         processed_lines = []
         i = 0
@@ -137,9 +153,14 @@ class LLMLogger:
             
             i += 1
         
-        # Write the processed content back to the file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.writelines(processed_lines)
+        return processed_lines
+    
+    def _write_log(self, log_path: str, log_data: Dict[str, Any]) -> None:
+        """Dump log_data, post-process it in memory and write the log file once."""
+        # StringIO.readlines() splits on '\n' only, like reading the file back would
+        lines = self._post_process_yaml_lines(io.StringIO(_dump_yaml(log_data)).readlines())
+        with open(log_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
     
     def log_request(
         self,
@@ -158,7 +179,7 @@ class LLMLogger:
         
         # Create the log data structure
         log_data = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": _now(timezone.utc).isoformat(),
             "request": request
         }
         
@@ -179,12 +200,8 @@ class LLMLogger:
         # This is critical for long strings that might otherwise use line continuations
         log_data = preprocess_yaml_data(log_data)
         
-        # Write the YAML using the dumper
-        with open(log_path, 'w', encoding='utf-8') as f:
-            yaml.dump(log_data, f, Dumper=ContentAwareYAMLDumper, default_flow_style=False, sort_keys=False, allow_unicode=True)
-        
-        # Post-process the file for content field formatting
-        self._post_process_yaml_file(log_path)
+        # Write the YAML using the dumper, with content fields formatted for markdown
+        self._write_log(log_path, log_data)
         
         # Track logs for this template
         if template_name not in self.template_logs:
@@ -233,12 +250,8 @@ class LLMLogger:
         # Preprocess data to ensure proper content field formatting
         log_data = preprocess_yaml_data(log_data)
         
-        # Write to file
-        with open(log_path, 'w', encoding='utf-8') as f:
-            yaml.dump(log_data, f, Dumper=ContentAwareYAMLDumper, default_flow_style=False, sort_keys=False, allow_unicode=True)
-        
-        # Post-process for content field formatting
-        self._post_process_yaml_file(log_path)
+        # Write to file, with content fields formatted for markdown
+        self._write_log(log_path, log_data)
             
     def complete_response(
         self,
@@ -314,12 +327,8 @@ class LLMLogger:
         # Preprocess data to ensure proper content field formatting
         log_data = preprocess_yaml_data(log_data)
         
-        # Write the final state
-        with open(log_path, 'w', encoding='utf-8') as f:
-            yaml.dump(log_data, f, Dumper=ContentAwareYAMLDumper, default_flow_style=False, sort_keys=False, allow_unicode=True)
-        
-        # Post-process for content field formatting
-        self._post_process_yaml_file(log_path)
+        # Write the final state, with content fields formatted for markdown
+        self._write_log(log_path, log_data)
         
         # Remove from active requests since it's complete
         if template_name in self.active_requests:
@@ -353,7 +362,7 @@ class RunLogger:
         Returns:
             A run ID in the format 'run_TIMESTAMP' or 'run_TIMESTAMP_name'
         """
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H-%M-%S-%f")
+        timestamp = _path_timestamp(_now(timezone.utc))
         
         if name:
             # Sanitize the name by replacing invalid characters with underscores
@@ -377,11 +386,8 @@ class RunLogger:
         run_id = self._generate_run_id(name)
         self.current_run_id = run_id
         
-        # Create run directory
+        # Create the run directory together with its llmcalls directory
         run_dir = os.path.join(self.base_log_dir, run_id)
-        os.makedirs(run_dir, exist_ok=True)
-        
-        # Create llmcalls directory inside the run directory
         llmcalls_dir = os.path.join(run_dir, "llmcalls")
         os.makedirs(llmcalls_dir, exist_ok=True)
         
@@ -391,13 +397,12 @@ class RunLogger:
         # Save context in the run directory
         context_path = os.path.join(run_dir, "context.yaml")
         with open(context_path, 'w', encoding='utf-8') as f:
-            yaml.dump(context or {}, f, Dumper=ContentAwareYAMLDumper, 
-                      default_flow_style=False, sort_keys=False, allow_unicode=True)
+            f.write(_dump_yaml(context or {}))
         
         # Save metadata
         if metadata is not None:
             metadata_with_timestamp = {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": _now(timezone.utc).isoformat(),
                 **metadata
             }
             
@@ -407,8 +412,7 @@ class RunLogger:
             
             metadata_path = os.path.join(run_dir, "metadata.yaml")
             with open(metadata_path, 'w', encoding='utf-8') as f:
-                yaml.dump(metadata_with_timestamp, f, Dumper=ContentAwareYAMLDumper, 
-                          default_flow_style=False, sort_keys=False, allow_unicode=True)
+                f.write(_dump_yaml(metadata_with_timestamp))
         
         return run_id
     
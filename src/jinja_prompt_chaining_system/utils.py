@@ -101,7 +101,8 @@ class RelativePathFileSystemLoader(FileSystemLoader):
         self, 
         searchpath: Union[str, os.PathLike, List[Union[str, os.PathLike]]], 
         encoding: str = 'utf-8', 
-        followlinks: bool = False
+        followlinks: bool = False,
+        cwd: Optional[Union[str, os.PathLike]] = None
     ):
         """
         Initialize the loader with the given search path(s).
@@ -110,8 +111,14 @@ class RelativePathFileSystemLoader(FileSystemLoader):
             searchpath: A path or list of paths to the template directory
             encoding: The encoding of the templates
             followlinks: Whether to follow symbolic links in the path
+            cwd: Directory used for non-relative includes; defaults to the
+                 process working directory at load time
         """
         super().__init__(searchpath, encoding, followlinks)
+        # Base directory for non-relative includes (None means the process CWD)
+        self.cwd = cwd
+        # Absolute search paths, normalized once for the attempted-paths lists in error messages
+        self._abs_searchpaths: List[str] = [os.path.abspath(p) for p in self.searchpath]
         # Dictionary to track template directories by template path
         self._template_dirs: Dict[str, str] = {}
         # The last template loaded - used to track the current include context
@@ -121,6 +128,10 @@ class RelativePathFileSystemLoader(FileSystemLoader):
         # Mapping of template paths to files that have been loaded through include statements
         self._included_templates: Dict[str, str] = {}
     
+    def _get_cwd(self) -> str:
+        """Return the directory that non-relative includes are resolved against."""
+        return os.fspath(self.cwd) if self.cwd is not None else os.getcwd()
+    
     def get_source(self, environment, template):
         """
         Get the template source, filename, and uptodate function.
@@ -222,7 +233,7 @@ class RelativePathFileSystemLoader(FileSystemLoader):
         # but only when we're processing an include tag, not a direct get_template call
         if not is_template_relative and is_in_include:
             # Try to load from current working directory
-            cwd_path = os.path.join(os.getcwd(), template)
+            cwd_path = os.path.join(self._get_cwd(), template)
             cwd_abs_path = os.path.abspath(cwd_path)
             attempted_paths.append(f"{cwd_abs_path} (from current working directory)")
             
@@ -280,16 +291,16 @@ class RelativePathFileSystemLoader(FileSystemLoader):
             
         # If we get here, the template was not found
         # Collect all the paths we tried for better error messages
-        for searchpath in self.searchpath:
+        pieces = split_template_path(template)
+        for searchpath in self._abs_searchpaths:
             if is_template_relative:
                 # For relative includes, we also show the direct path
                 direct_path = os.path.join(searchpath, template)
-                attempted_paths.append(f"{os.path.abspath(direct_path)} (from searchpath, treating relative as absolute)")
+                attempted_paths.append(f"{os.path.normpath(direct_path)} (from searchpath, treating relative as absolute)")
             else:
                 # For standard includes, collect the full resolved path
-                pieces = split_template_path(template)
                 resolved_path = os.path.join(searchpath, *pieces)
-                attempted_paths.append(f"{os.path.abspath(resolved_path)} (from searchpath)")
+                attempted_paths.append(f"{os.path.normpath(resolved_path)} (from searchpath)")
         
         # Create a more detailed error message
         plural = "path" if len(self.searchpath) == 1 else "paths"
@@ -337,14 +348,14 @@ class RelativePathFileSystemLoader(FileSystemLoader):
                 # Add CWD path to attempted_paths if this wasn't a template-relative path
                 # and we're in an include context
                 if not (name.startswith('./') or name.startswith('../')) and not self._in_direct_load:
-                    cwd_path = os.path.abspath(os.path.join(os.getcwd(), name))
+                    cwd_path = os.path.abspath(os.path.join(self._get_cwd(), name))
                     attempted_paths.append(f"{cwd_path} (from current working directory)")
                 
                 # Add absolute path information for search paths
                 if not attempted_paths or len(attempted_paths) < 2:
-                    for searchpath in self.searchpath:
+                    for searchpath in self._abs_searchpaths:
                         path = os.path.join(searchpath, name)
-                        attempted_paths.append(f"{os.path.abspath(path)} (from searchpath)")
+                        attempted_paths.append(f"{os.path.normpath(path)} (from searchpath)")
                 
                 # Create enhanced error with absolute path information
                 raise EnhancedTemplateNotFound(
@@ -0,0 +1,10 @@
+"""YAML loader and dumper shared by the tests.
+
+libyaml's C classes are used when PyYAML is built against it; otherwise the
+pure-Python safe classes stand in (tests/conftest.py warns when that happens).
+"""
+
+import yaml
+
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
@@ -0,0 +1,70 @@
+import pytest
+import yaml
+
+# Import the package modules up front so the first test to patch them doesn't pay for the import
+import jinja_prompt_chaining_system.api  # noqa: F401
+import jinja_prompt_chaining_system.cli  # noqa: F401
+import jinja_prompt_chaining_system.parser  # noqa: F401
+
+def pytest_configure(config):
+    # Checked once here rather than in each module that parses YAML (see tests/_yaml.py)
+    if not yaml.__with_libyaml__:
+        config.issue_config_time_warning(
+            pytest.PytestConfigWarning(
+                "PyYAML is not built against libyaml; YAML tests fall back to the slower pure-Python loader"
+            ),
+            stacklevel=2,
+        )
+
+@pytest.fixture(scope="session")
+def template_bytes():
+    return b'{% llmquery model="gpt-4" %}Hello, {{ name }}!{% endllmquery %}'
+
+@pytest.fixture(scope="session")
+def context_bytes():
+    return b"""
+    name: World
+    """
+
+# The file fixtures below are written once per session; tests must only read them.
+
+@pytest.fixture(scope="session")
+def template_file(tmp_path_factory, template_bytes):
+    template = tmp_path_factory.mktemp("templates") / "test.jinja"
+    template.write_bytes(template_bytes)
+    return str(template)
+
+@pytest.fixture(scope="session")
+def async_template_file(tmp_path_factory, template_bytes):
+    template = tmp_path_factory.mktemp("templates") / "async_test.jinja"
+    template.write_bytes(template_bytes)
+    return str(template)
+
+@pytest.fixture(scope="session")
+def context_file(tmp_path_factory, context_bytes):
+    context = tmp_path_factory.mktemp("contexts") / "context.yaml"
+    context.write_bytes(context_bytes)
+    return str(context)
+
+@pytest.fixture(scope="session")
+def test_dirs(tmp_path_factory):
+    """Create a directory structure for testing CWD-relative paths."""
+    temp_dir = tmp_path_factory.mktemp("jinja_test_")
+    
+    # Templates live in one directory; tests change into the other
+    template_dir = temp_dir / "templates"
+    template_dir.mkdir()
+    cwd_dir = temp_dir / "current_dir"
+    cwd_dir.mkdir()
+    
+    (template_dir / "main.jinja").write_bytes(
+        b"Main template - will include another template\n{% include 'included.jinja' %}"
+    )
+    # The included template is only in the CWD directory
+    (cwd_dir / "included.jinja").write_bytes(b"This is included from the CWD directory")
+    
+    return {
+        "temp_dir": str(temp_dir),
+        "template_dir": str(template_dir),
+        "cwd_dir": str(cwd_dir)
+    }
@@ -8,6 +8,9 @@ from pathlib import Path
 from jinja_prompt_chaining_system.llm import LLMClient
 from jinja_prompt_chaining_system.logger import LLMLogger
 
+# Set PYTEST_DEBUG_LOG=1 to print the raw log file while triaging formatting issues
+_DEBUG = bool(os.environ.get("PYTEST_DEBUG_LOG"))
+
 # Skip this test if no OpenAI API key is available
 pytestmark = pytest.mark.skipif(
     os.environ.get("OPENAI_API_KEY") is None,
@@ -85,10 +88,11 @@ def test_long_streaming_response():
         logger.complete_response(template_name, completion_data)
         
         # Print the log file for debugging
-        print(f"\nLog file path: {log_path}")
-        with open(log_path, 'r', encoding='utf-8') as f:
-            log_content = f.read()
-            print(f"Log file content:\n{log_content}")
+        if _DEBUG:
+            print(f"\nLog file path: {log_path}")
+            with open(log_path, 'r', encoding='utf-8') as f:
+                log_content = f.read()
+                print(f"Log file content:\n{log_content}")
             
         # Read the log file as YAML
         with open(log_path, 'r', encoding='utf-8') as f:
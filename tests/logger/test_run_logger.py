@@ -4,7 +4,6 @@ import pytest
 import re
 from pathlib import Path
 from datetime import datetime, timezone
-from unittest.mock import patch, Mock
 from jinja_prompt_chaining_system.logger import LLMLogger, RunLogger
 
 @pytest.fixture
@@ -130,10 +129,12 @@ def test_multiple_runs(run_logger, log_dir):
     log_path2 = llm_logger2.log_request(template_name, request)
     
     # Both log files should exist and be in their respective run directories
+    llmcalls_dir1 = log_dir / run_id1 / "llmcalls"
+    llmcalls_dir2 = log_dir / run_id2 / "llmcalls"
     assert os.path.exists(log_path1)
     assert os.path.exists(log_path2)
-    assert run_id1 in log_path1
-    assert run_id2 in log_path2
+    assert Path(log_path1).parent == llmcalls_dir1
+    assert Path(log_path2).parent == llmcalls_dir2
     assert run_id1 != run_id2
 
 def test_get_specific_run_logger(run_logger, log_dir):
@@ -143,11 +144,13 @@ def test_get_specific_run_logger(run_logger, log_dir):
     run_id2 = "run_2023-01-01T12-00-01-000002"
     
     # Create the directory structure
-    os.makedirs(os.path.join(str(log_dir), run_id1, "llmcalls"), exist_ok=True)
-    os.makedirs(os.path.join(str(log_dir), run_id2, "llmcalls"), exist_ok=True)
+    llmcalls_dir1 = log_dir / run_id1 / "llmcalls"
+    llmcalls_dir2 = log_dir / run_id2 / "llmcalls"
+    llmcalls_dir1.mkdir(parents=True, exist_ok=True)
+    llmcalls_dir2.mkdir(parents=True, exist_ok=True)
     
     # Store the run IDs in the logger's instance variables
-    run_logger.run_loggers[run_id1] = LLMLogger(os.path.join(str(log_dir), run_id1, "llmcalls"))
+    run_logger.run_loggers[run_id1] = LLMLogger(str(llmcalls_dir1))
     run_logger.current_run_id = run_id2
     
     # Get logger for the first run (not the current one)
@@ -159,15 +162,14 @@ def test_get_specific_run_logger(run_logger, log_dir):
     log_path1 = llm_logger1.log_request(template_name, request)
     
     # Verify it went to the correct run directory
-    assert run_id1 in log_path1
+    assert Path(log_path1).parent == llmcalls_dir1
     assert run_id2 not in log_path1
 
-@patch('jinja_prompt_chaining_system.logger.datetime')
-def test_run_id_format(mock_datetime, log_dir):
+def test_run_id_format(monkeypatch, log_dir):
     """Test that run IDs have the correct format."""
-    # Mock datetime to return a fixed value
+    # Freeze the logger clock at a fixed value
     mock_date = datetime(2023, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
-    mock_datetime.now.return_value = mock_date
+    monkeypatch.setattr('jinja_prompt_chaining_system.logger._now', lambda tz=None: mock_date)
     
     # Create a run logger and start a run
     run_logger = RunLogger(str(log_dir))
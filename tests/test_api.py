@@ -1,72 +1,59 @@
 import os
 import pytest
 import asyncio
-from unittest.mock import patch, Mock, AsyncMock
+from types import SimpleNamespace
+from unittest.mock import Mock
 from pathlib import Path
 
 from jinja_prompt_chaining_system import render_prompt, render_prompt_async
 
-@pytest.fixture
-def template_file(tmp_path):
-    template = tmp_path / "test.jinja"
-    template.write_text("""
-    {% llmquery model="gpt-4" temperature=0.7 %}
-    Hello, {{ name }}!
-    {% endllmquery %}
-    """)
-    return str(template)  # Return string path instead of Path
+@pytest.fixture(autouse=True)
+def mock_llm(monkeypatch):
+    """Keep every API test away from the real LLM client and logger."""
+    client = Mock()
+    client.query.return_value = "Hello, World!"
+    monkeypatch.setattr("jinja_prompt_chaining_system.parser.LLMClient", lambda *args, **kwargs: client)
+    monkeypatch.setattr("jinja_prompt_chaining_system.parser.LLMLogger", Mock())
+    return SimpleNamespace(client=client)
 
 @pytest.fixture
-def context_file(tmp_path):
-    context = tmp_path / "context.yaml"
-    context.write_text("""
-    name: World
-    """)
-    return str(context)  # Return string path instead of Path
+def mock_run_logger(monkeypatch):
+    """Replace the API's RunLogger with a Mock that hands out a fixed run ID."""
+    run_logger_instance = Mock()
+    run_logger_instance.start_run.return_value = "test_run_id"
+    run_logger_instance.get_llm_logger.return_value = Mock()
+    run_logger_cls = Mock(return_value=run_logger_instance)
+    monkeypatch.setattr("jinja_prompt_chaining_system.api.RunLogger", run_logger_cls)
+    return run_logger_cls
+
+def resolved_future(value):
+    """Return a future that already holds value, so awaiting it needs no extra loop step."""
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(value)
+    return future
 
 @pytest.fixture
 def context_dict():
     return {"name": "World"}
 
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_render_prompt_basic(mock_logger, mock_llm_client, template_file, context_file):
+def test_render_prompt_basic(template_file, context_file):
     """Test basic API function with file paths."""
-    # Setup mocks
-    client = Mock()
-    client.query.return_value = "Hello, World!"
-    mock_llm_client.return_value = client
-    
     # Call the function
     result = render_prompt(template_file, context_file)
     
     # Check that the result contains our mocked response
     assert "Hello, World!" in result
 
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_render_prompt_with_dict(mock_logger, mock_llm_client, template_file, context_dict):
+def test_render_prompt_with_dict(template_file, context_dict):
     """Test API function with context as dictionary."""
-    # Setup mocks
-    client = Mock()
-    client.query.return_value = "Hello, World!"
-    mock_llm_client.return_value = client
-    
     # Call the function
     result = render_prompt(template_file, context_dict)
     
     # Check that the result contains our mocked response
     assert "Hello, World!" in result
 
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_render_prompt_with_output(mock_logger, mock_llm_client, template_file, context_file, tmp_path):
+def test_render_prompt_with_output(template_file, context_file, tmp_path):
     """Test API function with output file."""
-    # Setup mocks
-    client = Mock()
-    client.query.return_value = "Hello, World!"
-    mock_llm_client.return_value = client
-    
     # Set output path
     output_path = str(tmp_path / "output" / "output.txt")
     
@@ -81,21 +68,9 @@ def test_render_prompt_with_output(mock_logger, mock_llm_client, template_file,
     with open(output_path, 'r') as f:
         assert "Hello, World!" in f.read()
 
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-@patch('jinja_prompt_chaining_system.api.RunLogger')
-def test_render_prompt_with_logdir(mock_run_logger, mock_llm_logger, mock_llm_client, template_file, context_file, tmp_path):
+def test_render_prompt_with_logdir(mock_run_logger, template_file, context_file, tmp_path):
     """Test API function with log directory."""
-    # Setup mocks
-    client = Mock()
-    client.query.return_value = "Hello, World!"
-    mock_llm_client.return_value = client
-    
-    # Mock RunLogger
-    run_logger_instance = Mock()
-    run_logger_instance.start_run.return_value = "test_run_id"
-    run_logger_instance.get_llm_logger.return_value = Mock()
-    mock_run_logger.return_value = run_logger_instance
+    run_logger_instance = mock_run_logger.return_value
     
     # Set log directory
     log_dir = str(tmp_path / "logs")
@@ -112,21 +87,9 @@ def test_render_prompt_with_logdir(mock_run_logger, mock_llm_logger, mock_llm_cl
     run_logger_instance.get_llm_logger.assert_called_once_with("test_run_id")
     run_logger_instance.end_run.assert_called_once()
 
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-@patch('jinja_prompt_chaining_system.api.RunLogger')
-def test_render_prompt_with_run_name(mock_run_logger, mock_llm_logger, mock_llm_client, template_file, context_dict, tmp_path):
+def test_render_prompt_with_run_name(mock_run_logger, template_file, context_dict, tmp_path):
     """Test that the API function correctly passes the run name to RunLogger."""
-    # Setup mocks
-    client = Mock()
-    client.query.return_value = "Hello, World!"
-    mock_llm_client.return_value = client
-    
-    # Mock RunLogger
-    run_logger_instance = Mock()
-    run_logger_instance.start_run.return_value = "test_run_id"
-    run_logger_instance.get_llm_logger.return_value = Mock()
-    mock_run_logger.return_value = run_logger_instance
+    run_logger_instance = mock_run_logger.return_value
     
     # Set log directory and run name
     log_dir = str(tmp_path / "logs")
@@ -147,62 +110,28 @@ def test_render_prompt_with_run_name(mock_run_logger, mock_llm_logger, mock_llm_
     run_logger_instance.get_llm_logger.assert_called_once_with("test_run_id")
     run_logger_instance.end_run.assert_called_once()
 
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_render_prompt_file_not_found(mock_logger, mock_llm_client, tmp_path):
-    """Test API function with nonexistent template file."""
-    nonexistent_template = str(tmp_path / "nonexistent.jinja")
-    context_file = str(tmp_path / "context.yaml")
-    with open(context_file, 'w') as f:
-        f.write("name: World")
+@pytest.mark.parametrize("template_name,context_name,expected_exception", [
+    pytest.param("nonexistent.jinja", None, FileNotFoundError, id="file_not_found"),
+    pytest.param(None, "nonexistent.yaml", FileNotFoundError, id="invalid_context_file"),
+    pytest.param(None, "invalid.yaml", ValueError, id="invalid_yaml"),
+])
+def test_render_prompt_error(template_name, context_name, expected_exception, template_file, context_file, tmp_path):
+    """Test API function with a nonexistent template, a nonexistent context file, or invalid YAML context.
     
-    # Check that FileNotFoundError is raised
-    with pytest.raises(FileNotFoundError):
-        render_prompt(nonexistent_template, context_file)
-
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_render_prompt_invalid_context_file(mock_logger, mock_llm_client, template_file, tmp_path):
-    """Test API function with nonexistent context file."""
-    nonexistent_context = str(tmp_path / "nonexistent.yaml")
-    
-    # Check that FileNotFoundError is raised
-    with pytest.raises(FileNotFoundError):
-        render_prompt(template_file, nonexistent_context)
-
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_render_prompt_invalid_yaml(mock_logger, mock_llm_client, template_file, tmp_path):
-    """Test API function with invalid YAML context."""
-    invalid_yaml = str(tmp_path / "invalid.yaml")
-    with open(invalid_yaml, 'w') as f:
-        f.write("invalid: yaml: content")
+    Names are looked up in tmp_path, which holds an invalid.yaml; None uses the shared fixture file.
+    """
+    (tmp_path / "invalid.yaml").write_text("invalid: yaml: content")
+    template = str(tmp_path / template_name) if template_name else template_file
+    context = str(tmp_path / context_name) if context_name else context_file
     
-    # Check that ValueError is raised
-    with pytest.raises(ValueError):
-        render_prompt(template_file, invalid_yaml)
-
-@pytest.fixture
-def async_template_file(tmp_path):
-    template = tmp_path / "async_test.jinja"
-    template.write_text("""
-    {% llmquery model="gpt-4" temperature=0.7 %}
-    Hello, {{ name }}!
-    {% endllmquery %}
-    """)
-    return str(template)  # Return string path instead of Path
+    with pytest.raises(expected_exception):
+        render_prompt(template, context)
 
 @pytest.mark.asyncio
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-async def test_render_prompt_async(mock_logger, mock_llm_client, async_template_file, context_dict):
+async def test_render_prompt_async(mock_llm, async_template_file, context_dict):
     """Test async API function."""
     # Setup mocks
-    client = Mock()
-    client.query_async = AsyncMock()
-    client.query_async.return_value = "Hello, World!"
-    client.query = Mock(return_value="Hello, World!")  # For synchronous fallback
-    mock_llm_client.return_value = client
+    mock_llm.client.query_async = Mock(return_value=resolved_future("Hello, World!"))
     
     # Call the async function
     result = await render_prompt_async(async_template_file, context_dict)
@@ -211,23 +140,12 @@ async def test_render_prompt_async(mock_logger, mock_llm_client, async_template_
     assert "Hello, World!" in result
 
 @pytest.mark.asyncio
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-@patch('jinja_prompt_chaining_system.api.RunLogger')
-async def test_render_prompt_async_with_logdir(mock_run_logger, mock_llm_logger, mock_llm_client, async_template_file, context_dict, tmp_path):
+async def test_render_prompt_async_with_logdir(mock_llm, mock_run_logger, async_template_file, context_dict, tmp_path):
     """Test async API function with log directory."""
     # Setup mocks
-    client = Mock()
-    client.query_async = AsyncMock()
-    client.query_async.return_value = "Hello, World!"
-    client.query = Mock(return_value="Hello, World!")  # For synchronous fallback
-    mock_llm_client.return_value = client
+    mock_llm.client.query_async = Mock(return_value=resolved_future("Hello, World!"))
     
-    # Mock RunLogger
-    run_logger_instance = Mock()
-    run_logger_instance.start_run.return_value = "test_run_id"
-    run_logger_instance.get_llm_logger.return_value = Mock()
-    mock_run_logger.return_value = run_logger_instance
+    run_logger_instance = mock_run_logger.return_value
     
     # Set log directory
     log_dir = str(tmp_path / "logs")
@@ -245,23 +163,12 @@ async def test_render_prompt_async_with_logdir(mock_run_logger, mock_llm_logger,
     run_logger_instance.end_run.assert_called_once()
 
 @pytest.mark.asyncio
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-@patch('jinja_prompt_chaining_system.api.RunLogger')
-async def test_render_prompt_async_with_run_name(mock_run_logger, mock_llm_logger, mock_llm_client, async_template_file, context_dict, tmp_path):
+async def test_render_prompt_async_with_run_name(mock_llm, mock_run_logger, async_template_file, context_dict, tmp_path):
     """Test that the async API function correctly passes the run name to RunLogger."""
     # Setup mocks
-    client = Mock()
-    client.query_async = AsyncMock()
-    client.query_async.return_value = "Hello, World!"
-    client.query = Mock(return_value="Hello, World!")  # For synchronous fallback
-    mock_llm_client.return_value = client
+    mock_llm.client.query_async = Mock(return_value=resolved_future("Hello, World!"))
     
-    # Mock RunLogger
-    run_logger_instance = Mock()
-    run_logger_instance.start_run.return_value = "test_run_id"
-    run_logger_instance.get_llm_logger.return_value = Mock()
-    mock_run_logger.return_value = run_logger_instance
+    run_logger_instance = mock_run_logger.return_value
     
     # Set log directory and run name
     log_dir = str(tmp_path / "logs")
@@ -283,16 +190,10 @@ async def test_render_prompt_async_with_run_name(mock_run_logger, mock_llm_logge
     run_logger_instance.end_run.assert_called_once()
 
 @pytest.mark.asyncio
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-async def test_render_prompt_async_with_output(mock_logger, mock_llm_client, async_template_file, context_dict, tmp_path):
+async def test_render_prompt_async_with_output(mock_llm, async_template_file, context_dict, tmp_path):
     """Test async API function with output file."""
     # Setup mocks
-    client = Mock()
-    client.query_async = AsyncMock()
-    client.query_async.return_value = "Hello, World!"
-    client.query = Mock(return_value="Hello, World!")  # For synchronous fallback
-    mock_llm_client.return_value = client
+    mock_llm.client.query_async = Mock(return_value=resolved_future("Hello, World!"))
     
     # Set output path
     output_path = str(tmp_path / "output" / "async_output.txt")
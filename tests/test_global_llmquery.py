@@ -5,6 +5,7 @@ from unittest.mock import patch, Mock, AsyncMock
 from jinja2 import Environment, FileSystemLoader
 from jinja_prompt_chaining_system.parser import LLMQueryExtension
 from jinja_prompt_chaining_system.logger import RunLogger, LLMLogger
+from tests._yaml import Loader
 
 class MockLLM:
     """Mock LLM client for testing."""
@@ -20,9 +21,9 @@ class MockLLM:
         """Mock async query method."""
         return self.response
 
-@pytest.fixture
-def mock_env():
-    """Create a Jinja environment with a mock LLM."""
+@pytest.fixture(scope="session")
+def llmquery_env():
+    """Create a Jinja environment with a mock LLM, shared across the session."""
     # Create a new environment
     env = Environment(
         loader=FileSystemLoader("."),
@@ -39,10 +40,22 @@ def mock_env():
     
     return env, extension
 
+@pytest.fixture
+def mock_env(llmquery_env):
+    """Hand out the shared environment and undo any per-test extension state."""
+    env, extension = llmquery_env
+    logger = extension.logger
+    
+    yield env, extension
+    
+    extension.llm_client.response = "Test response"
+    extension.logger = logger
+    extension.template_name = None
+
 def test_global_llmquery_function_basic(mock_env):
     """Test basic functionality of the global llmquery function."""
     env, extension = mock_env
-    extension.llm_client = MockLLM("Test response")
+    extension.llm_client.response = "Test response"
     
     # Create a test template
     template_str = '{{ llmquery(prompt="Test prompt", model="gpt-4") }}'
@@ -57,7 +70,7 @@ def test_global_llmquery_function_basic(mock_env):
 def test_global_llmquery_with_variables(mock_env):
     """Test using the global llmquery function with variables in the prompt."""
     env, extension = mock_env
-    extension.llm_client = MockLLM("Hello, World!")
+    extension.llm_client.response = "Hello, World!"
     
     # Create a template with variables
     template_str = '''
@@ -75,7 +88,7 @@ def test_global_llmquery_with_variables(mock_env):
 def test_global_llmquery_with_context(mock_env):
     """Test using the global llmquery function with context variables."""
     env, extension = mock_env
-    extension.llm_client = MockLLM("Hello, Test User!")
+    extension.llm_client.response = "Hello, Test User!"
     
     # Create a template using context
     template_str = '{{ llmquery(prompt="Hello, " + user + "!", model="gpt-4") }}'
@@ -90,7 +103,7 @@ def test_global_llmquery_with_context(mock_env):
 def test_global_llmquery_with_multiline_prompt(mock_env):
     """Test using the global llmquery function with a multiline prompt."""
     env, extension = mock_env
-    extension.llm_client = MockLLM("Multiline response")
+    extension.llm_client.response = "Multiline response"
     
     # Create a template with a multiline prompt
     template_str = '''
@@ -112,13 +125,10 @@ def test_global_llmquery_with_multiline_prompt(mock_env):
 def test_global_llmquery_with_logging(mock_env, tmp_path):
     """Test that the global llmquery function logs correctly."""
     env, extension = mock_env
-    extension.llm_client = MockLLM("Logged response")
+    extension.llm_client.response = "Logged response"
     
-    # Setup logging directory
+    # Setup RunLogger; it creates the logging directory itself
     log_dir = str(tmp_path / "logs")
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Setup RunLogger
     run_logger = RunLogger(log_dir)
     run_id = run_logger.start_run(metadata={"test": True}, context={"test": True})
     llm_logger = run_logger.get_llm_logger(run_id)
@@ -147,7 +157,7 @@ def test_global_llmquery_with_logging(mock_env, tmp_path):
     
     # Verify log content
     with open(os.path.join(llmcalls_dir, log_files[0]), 'r') as f:
-        log_data = yaml.safe_load(f)
+        log_data = yaml.load(f, Loader=Loader)
     
     assert log_data["request"]["model"] == "gpt-4"
     assert "Test prompt for logging" in log_data["request"]["messages"][0]["content"]
@@ -157,7 +167,7 @@ def test_global_llmquery_with_logging(mock_env, tmp_path):
 async def test_global_llmquery_async(mock_env):
     """Test the global llmquery function in async context."""
     env, extension = mock_env
-    extension.llm_client = MockLLM("Async response")
+    extension.llm_client.response = "Async response"
     
     # Create a test template
     template_str = '{{ llmquery(prompt="Async test prompt", model="gpt-4") }}'
@@ -2,203 +2,172 @@ import os
 import pytest
 import tempfile
 import yaml
-from unittest.mock import patch, Mock
+from unittest.mock import Mock
 from click.testing import CliRunner
 from jinja_prompt_chaining_system.cli import main
 from jinja_prompt_chaining_system import create_environment
 
+# Relative path -> content for every file in the edge-case template tree
+EDGE_CASE_TEMPLATES = {
+    # Template with deeply nested includes (5+ levels deep)
+    "deep_nesting.jinja": """
+        {% llmquery model="gpt-4" %}
+        Deep nesting test
+        {% include 'nested/level1.jinja' %}
+        {% endllmquery %}
+        """,
+    "nested/level1.jinja": "Level 1 content\n{% include 'nested/level2.jinja' %}",
+    "nested/level2.jinja": "Level 2 content\n{% include 'nested/level3.jinja' %}",
+    "nested/level3.jinja": "Level 3 content\n{% include 'nested/level4.jinja' %}",
+    "nested/level4.jinja": "Level 4 content\n{% include 'nested/level5.jinja' %}",
+    "nested/level5.jinja": "Level 5 content (deepest)",
+    
+    # Template with recursive include and max_depth control
+    "recursive.jinja": """
+        {% llmquery model="gpt-4" %}
+        Recursive template with max depth
+        {% include 'nested/recursive_include.jinja' with context %}
+        {% endllmquery %}
+        """,
+    "nested/recursive_include.jinja": """
+        Current depth: {{ current_depth|default(1) }}
+        {% if current_depth|default(1) < max_depth|default(3) %}
+            {% set next_depth = current_depth|default(1) + 1 %}
+            {% include 'nested/recursive_include.jinja' with context %}
+        {% else %}
+            Maximum depth reached
+        {% endif %}
+        """,
+    
+    # Template with include inside a complex Jinja structure
+    "complex_structure.jinja": """
+        {% llmquery model="gpt-4" %}
+        {% for item in items %}
+            {% if loop.first %}
+                First item: {{ item }}
+                {% include 'nested/first_item.jinja' %}
+            {% elif loop.last %}
+                Last item: {{ item }}
+                {% include 'nested/last_item.jinja' %}
+            {% else %}
+                Middle item: {{ item }}
+                {% include 'nested/middle_item.jinja' %}
+            {% endif %}
+        {% endfor %}
+        {% endllmquery %}
+        """,
+    "nested/first_item.jinja": "First item template content",
+    "nested/middle_item.jinja": "Middle item template content",
+    "nested/last_item.jinja": "Last item template content",
+    
+    # Template with extremely large include
+    "large_include.jinja": """
+        {% llmquery model="gpt-4" %}
+        Template with large included content:
+        {% include 'nested/large_content.jinja' %}
+        {% endllmquery %}
+        """,
+    
+    # A large file (10KB of content)
+    "nested/large_content.jinja": "Large content line\n" * 1000,
+    
+    # Template with broken/invalid Jinja syntax in included file
+    "invalid_include.jinja": """
+        {% llmquery model="gpt-4" %}
+        Template including file with invalid syntax:
+        {% include 'nested/invalid_syntax.jinja' %}
+        {% endllmquery %}
+        """,
+    "nested/invalid_syntax.jinja": """
+        This template has invalid Jinja syntax:
+        {{ unclosed_variable
+        {% if broken_if %}
+        """,
+    
+    # Template with escaping issues
+    "escaping.jinja": """
+        {% llmquery model="gpt-4" %}
+        Template with escaping challenges:
+        {% include 'nested/escaped_content.jinja' %}
+        {% endllmquery %}
+        """,
+    "nested/escaped_content.jinja": """
+        This template has content that needs escaping:
+        {{ "{% raw %}" }}
+        This looks like a Jinja tag but isn't: {% include 'fake_include.jinja' %}
+        {{ "{% endraw %}" }}
+        
+        Quotes and backslashes: "quoted \\ backslash" and {{ '"another quoted"' }}
+        """,
+    
+    # Template with include from parent directory
+    "parent.jinja": """
+        {% llmquery model="gpt-4" %}
+        Parent template content
+        {% endllmquery %}
+        """,
+    "subdir/child.jinja": """
+        {% llmquery model="gpt-4" %}
+        Child template including parent:
+        {% include '../parent.jinja' %}
+        {% endllmquery %}
+        """,
+    
+    # Template with syntax that could confuse the LLM parser
+    "confusing_syntax.jinja": """
+        {% llmquery model="gpt-4" %}
+        This template has content that might confuse parsing:
+        
+        Here's a code sample with Jinja-like syntax:
+        ```python
+        def render_template():
+            template = "{% include 'something.html' %}"
+            return template.render()
+        ```
+        
+        {% include 'nested/normal_include.jinja' %}
+        {% endllmquery %}
+        """,
+    "nested/normal_include.jinja": "Normal included content",
+    
+    # Context file
+    "context.yaml": """
+        max_depth: 3
+        current_depth: 1
+        items:
+          - "Apple"
+          - "Banana"
+          - "Cherry"
+        """,
+}
+
 @pytest.fixture
 def runner():
     return CliRunner()
 
-@pytest.fixture
-def edge_case_templates():
+@pytest.fixture(autouse=True)
+def llm_client(monkeypatch):
+    """Mocked LLM client shared by every LLMQueryExtension the CLI creates; logging is mocked too."""
+    client = Mock()
+    monkeypatch.setattr("jinja_prompt_chaining_system.parser.LLMClient", lambda *args, **kwargs: client)
+    monkeypatch.setattr("jinja_prompt_chaining_system.parser.LLMLogger", lambda *args, **kwargs: Mock())
+    return client
+
+@pytest.fixture(scope="session")
+def edge_case_templates(tmp_path_factory):
     """Create templates for testing edge cases with include and llmquery."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create a template with deeply nested includes (5+ levels deep)
-        os.makedirs(os.path.join(tmpdir, "nested"), exist_ok=True)
-        
-        with open(os.path.join(tmpdir, "deep_nesting.jinja"), "w") as f:
-            f.write("""
-            {% llmquery model="gpt-4" %}
-            Deep nesting test
-            {% include 'nested/level1.jinja' %}
-            {% endllmquery %}
-            """)
-        
-        with open(os.path.join(tmpdir, "nested", "level1.jinja"), "w") as f:
-            f.write("Level 1 content\n{% include 'nested/level2.jinja' %}")
-        
-        with open(os.path.join(tmpdir, "nested", "level2.jinja"), "w") as f:
-            f.write("Level 2 content\n{% include 'nested/level3.jinja' %}")
-        
-        with open(os.path.join(tmpdir, "nested", "level3.jinja"), "w") as f:
-            f.write("Level 3 content\n{% include 'nested/level4.jinja' %}")
-        
-        with open(os.path.join(tmpdir, "nested", "level4.jinja"), "w") as f:
-            f.write("Level 4 content\n{% include 'nested/level5.jinja' %}")
-        
-        with open(os.path.join(tmpdir, "nested", "level5.jinja"), "w") as f:
-            f.write("Level 5 content (deepest)")
-        
-        # Create a template with recursive include and max_depth control
-        with open(os.path.join(tmpdir, "recursive.jinja"), "w") as f:
-            f.write("""
-            {% llmquery model="gpt-4" %}
-            Recursive template with max depth
-            {% include 'nested/recursive_include.jinja' with context %}
-            {% endllmquery %}
-            """)
-        
-        with open(os.path.join(tmpdir, "nested", "recursive_include.jinja"), "w") as f:
-            f.write("""
-            Current depth: {{ current_depth|default(1) }}
-            {% if current_depth|default(1) < max_depth|default(3) %}
-                {% set next_depth = current_depth|default(1) + 1 %}
-                {% include 'nested/recursive_include.jinja' with context %}
-            {% else %}
-                Maximum depth reached
-            {% endif %}
-            """)
-        
-        # Create a template with include inside a complex Jinja structure
-        with open(os.path.join(tmpdir, "complex_structure.jinja"), "w") as f:
-            f.write("""
-            {% llmquery model="gpt-4" %}
-            {% for item in items %}
-                {% if loop.first %}
-                    First item: {{ item }}
-                    {% include 'nested/first_item.jinja' %}
-                {% elif loop.last %}
-                    Last item: {{ item }}
-                    {% include 'nested/last_item.jinja' %}
-                {% else %}
-                    Middle item: {{ item }}
-                    {% include 'nested/middle_item.jinja' %}
-                {% endif %}
-            {% endfor %}
-            {% endllmquery %}
-            """)
-        
-        with open(os.path.join(tmpdir, "nested", "first_item.jinja"), "w") as f:
-            f.write("First item template content")
-        
-        with open(os.path.join(tmpdir, "nested", "middle_item.jinja"), "w") as f:
-            f.write("Middle item template content")
-        
-        with open(os.path.join(tmpdir, "nested", "last_item.jinja"), "w") as f:
-            f.write("Last item template content")
-        
-        # Create template with extremely large include
-        with open(os.path.join(tmpdir, "large_include.jinja"), "w") as f:
-            f.write("""
-            {% llmquery model="gpt-4" %}
-            Template with large included content:
-            {% include 'nested/large_content.jinja' %}
-            {% endllmquery %}
-            """)
-        
-        # Create a large file (10KB of content)
-        with open(os.path.join(tmpdir, "nested", "large_content.jinja"), "w") as f:
-            f.write("Large content line\n" * 1000)
-        
-        # Template with broken/invalid Jinja syntax in included file
-        with open(os.path.join(tmpdir, "invalid_include.jinja"), "w") as f:
-            f.write("""
-            {% llmquery model="gpt-4" %}
-            Template including file with invalid syntax:
-            {% include 'nested/invalid_syntax.jinja' %}
-            {% endllmquery %}
-            """)
-        
-        with open(os.path.join(tmpdir, "nested", "invalid_syntax.jinja"), "w") as f:
-            f.write("""
-            This template has invalid Jinja syntax:
-            {{ unclosed_variable
-            {% if broken_if %}
-            """)
-        
-        # Template with escaping issues
-        with open(os.path.join(tmpdir, "escaping.jinja"), "w") as f:
-            f.write("""
-            {% llmquery model="gpt-4" %}
-            Template with escaping challenges:
-            {% include 'nested/escaped_content.jinja' %}
-            {% endllmquery %}
-            """)
-        
-        with open(os.path.join(tmpdir, "nested", "escaped_content.jinja"), "w") as f:
-            f.write("""
-            This template has content that needs escaping:
-            {{ "{% raw %}" }}
-            This looks like a Jinja tag but isn't: {% include 'fake_include.jinja' %}
-            {{ "{% endraw %}" }}
-            
-            Quotes and backslashes: "quoted \\ backslash" and {{ '"another quoted"' }}
-            """)
-        
-        # Template with include from parent directory
-        os.makedirs(os.path.join(tmpdir, "subdir"), exist_ok=True)
-        
-        with open(os.path.join(tmpdir, "parent.jinja"), "w") as f:
-            f.write("""
-            {% llmquery model="gpt-4" %}
-            Parent template content
-            {% endllmquery %}
-            """)
-        
-        with open(os.path.join(tmpdir, "subdir", "child.jinja"), "w") as f:
-            f.write("""
-            {% llmquery model="gpt-4" %}
-            Child template including parent:
-            {% include '../parent.jinja' %}
-            {% endllmquery %}
-            """)
-        
-        # Template with syntax that could confuse the LLM parser
-        with open(os.path.join(tmpdir, "confusing_syntax.jinja"), "w") as f:
-            f.write("""
-            {% llmquery model="gpt-4" %}
-            This template has content that might confuse parsing:
-            
-            Here's a code sample with Jinja-like syntax:
-            ```python
-            def render_template():
-                template = "{% include 'something.html' %}"
-                return template.render()
-            ```
-            
-            {% include 'nested/normal_include.jinja' %}
-            {% endllmquery %}
-            """)
-        
-        with open(os.path.join(tmpdir, "nested", "normal_include.jinja"), "w") as f:
-            f.write("Normal included content")
-        
-        # Create a context file
-        with open(os.path.join(tmpdir, "context.yaml"), "w") as f:
-            f.write("""
-            max_depth: 3
-            current_depth: 1
-            items:
-              - "Apple"
-              - "Banana"
-              - "Cherry"
-            """)
-        
-        yield tmpdir
+    tmpdir = tmp_path_factory.mktemp("edge_case_templates")
+    # Create each subdirectory once; sorting puts parents before children
+    for rel_dir in sorted({os.path.dirname(rel_path) for rel_path in EDGE_CASE_TEMPLATES} - {""}):
+        (tmpdir / rel_dir).mkdir(parents=True, exist_ok=True)
+    for rel_path, content in EDGE_CASE_TEMPLATES.items():
+        (tmpdir / rel_path).write_text(content)
+    return str(tmpdir)
 
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_deeply_nested_includes(mock_logger, mock_llm_client, runner, edge_case_templates):
+def test_deeply_nested_includes(llm_client, runner, edge_case_templates):
     """Test templates with deeply nested includes (5+ levels deep)."""
-    # Setup mocks
-    client_instance = Mock()
-    client_instance.query.return_value = "Response with deeply nested includes"
-    mock_llm_client.return_value = client_instance
-    
-    logger_instance = Mock()
-    mock_logger.return_value = logger_instance
+    # Set the mocked client's response
+    llm_client.query.return_value = "Response with deeply nested includes"
     
     # Run CLI command
     with tempfile.TemporaryDirectory() as log_dir:
@@ -215,8 +184,8 @@ def test_deeply_nested_includes(mock_logger, mock_llm_client, runner, edge_case_
         assert result.exit_code == 0
         
         # Verify all nested content was included
-        client_instance.query.assert_called_once()
-        prompt = client_instance.query.call_args[0][0]
+        llm_client.query.assert_called_once()
+        prompt = llm_client.query.call_args[0][0]
         assert "Deep nesting test" in prompt
         assert "Level 1 content" in prompt
         assert "Level 2 content" in prompt
@@ -225,17 +194,10 @@ def test_deeply_nested_includes(mock_logger, mock_llm_client, runner, edge_case_
         assert "Level 5 content (deepest)" in prompt
 
 @pytest.mark.skip("Test skipped - need to fix recursive include behavior")
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_recursive_include_with_depth_control(mock_logger, mock_llm_client, runner, edge_case_templates):
+def test_recursive_include_with_depth_control(llm_client, runner, edge_case_templates):
     """Test recursive includes with depth control."""
-    # Setup mocks
-    client_instance = Mock()
-    client_instance.query.return_value = "Response with controlled recursive includes"
-    mock_llm_client.return_value = client_instance
-    
-    logger_instance = Mock()
-    mock_logger.return_value = logger_instance
+    # Set the mocked client's response
+    llm_client.query.return_value = "Response with controlled recursive includes"
     
     # Run CLI command
     with tempfile.TemporaryDirectory() as log_dir:
@@ -252,8 +214,8 @@ def test_recursive_include_with_depth_control(mock_logger, mock_llm_client, runn
         assert result.exit_code == 0
         
         # Verify recursive includes with depth control
-        client_instance.query.assert_called_once()
-        prompt = client_instance.query.call_args[0][0]
+        llm_client.query.assert_called_once()
+        prompt = llm_client.query.call_args[0][0]
         assert "Recursive template with max depth" in prompt
         assert "Current depth: 1" in prompt
         assert "Current depth: 2" in prompt
@@ -262,17 +224,10 @@ def test_recursive_include_with_depth_control(mock_logger, mock_llm_client, runn
         # Should not go deeper than max_depth
         assert "Current depth: 4" not in prompt
 
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_includes_in_complex_structures(mock_logger, mock_llm_client, runner, edge_case_templates):
+def test_includes_in_complex_structures(llm_client, runner, edge_case_templates):
     """Test includes inside complex Jinja structures like loops and conditionals."""
-    # Setup mocks
-    client_instance = Mock()
-    client_instance.query.return_value = "Response with complex structure includes"
-    mock_llm_client.return_value = client_instance
-    
-    logger_instance = Mock()
-    mock_logger.return_value = logger_instance
+    # Set the mocked client's response
+    llm_client.query.return_value = "Response with complex structure includes"
     
     # Run CLI command
     with tempfile.TemporaryDirectory() as log_dir:
@@ -289,8 +244,8 @@ def test_includes_in_complex_structures(mock_logger, mock_llm_client, runner, ed
         assert result.exit_code == 0
         
         # Verify complex structure with includes
-        client_instance.query.assert_called_once()
-        prompt = client_instance.query.call_args[0][0]
+        llm_client.query.assert_called_once()
+        prompt = llm_client.query.call_args[0][0]
         assert "First item: Apple" in prompt
         assert "First item template content" in prompt
         assert "Middle item: Banana" in prompt
@@ -298,17 +253,10 @@ def test_includes_in_complex_structures(mock_logger, mock_llm_client, runner, ed
         assert "Last item: Cherry" in prompt
         assert "Last item template content" in prompt
 
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_large_included_content(mock_logger, mock_llm_client, runner, edge_case_templates):
+def test_large_included_content(llm_client, runner, edge_case_templates):
     """Test including very large content into an LLM query."""
-    # Setup mocks
-    client_instance = Mock()
-    client_instance.query.return_value = "Response with large included content"
-    mock_llm_client.return_value = client_instance
-    
-    logger_instance = Mock()
-    mock_logger.return_value = logger_instance
+    # Set the mocked client's response
+    llm_client.query.return_value = "Response with large included content"
     
     # Run CLI command
     with tempfile.TemporaryDirectory() as log_dir:
@@ -325,41 +273,34 @@ def test_large_included_content(mock_logger, mock_llm_client, runner, edge_case_
         assert result.exit_code == 0
         
         # Verify large included content was processed
-        client_instance.query.assert_called_once()
-        prompt = client_instance.query.call_args[0][0]
+        llm_client.query.assert_called_once()
+        prompt = llm_client.query.call_args[0][0]
         assert "Template with large included content:" in prompt
         assert "Large content line" in prompt
         # Verify that the large content was included
         assert len(prompt) > 10000  # Should be over 10KB with the included content
 
-def test_invalid_jinja_in_included_file(runner, edge_case_templates):
+def test_invalid_jinja_in_included_file(edge_case_templates, capsys):
     """Test behavior with invalid Jinja syntax in an included file."""
-    # Run CLI command with the invalid template
+    # Run the CLI callback directly with the invalid template, skipping Click's argument parsing
     template_path = os.path.join(edge_case_templates, "invalid_include.jinja")
     context_path = os.path.join(edge_case_templates, "context.yaml")
     
-    result = runner.invoke(main, [
-        template_path,
-        "--context", context_path
-    ])
+    with pytest.raises(SystemExit) as excinfo:
+        main.callback(template=template_path, context=context_path, out=None, logdir=None,
+                      name=None, verbose=False, quiet=False, key_value_pairs=())
     
     # Should fail due to invalid Jinja syntax
-    assert result.exit_code != 0
+    assert excinfo.value.code != 0
     # Modified to be more generic about the error - we don't care about the exact error message
-    assert "error" in result.output.lower() or "exception" in result.output.lower()
+    output = capsys.readouterr().err.lower()
+    assert "error" in output or "exception" in output
 
 @pytest.mark.skip("Test skipped - need to fix escaping behavior")
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_escaping_in_included_content(mock_logger, mock_llm_client, runner, edge_case_templates):
+def test_escaping_in_included_content(llm_client, runner, edge_case_templates):
     """Test proper escaping of special characters and Jinja-like content in includes."""
-    # Setup mocks
-    client_instance = Mock()
-    client_instance.query.return_value = "Response with escaped content"
-    mock_llm_client.return_value = client_instance
-    
-    logger_instance = Mock()
-    mock_logger.return_value = logger_instance
+    # Set the mocked client's response
+    llm_client.query.return_value = "Response with escaped content"
     
     # Run CLI command
     with tempfile.TemporaryDirectory() as log_dir:
@@ -376,8 +317,8 @@ def test_escaping_in_included_content(mock_logger, mock_llm_client, runner, edge
         assert result.exit_code == 0
         
         # Verify escaped content was handled properly
-        client_instance.query.assert_called_once()
-        prompt = client_instance.query.call_args[0][0]
+        llm_client.query.assert_called_once()
+        prompt = llm_client.query.call_args[0][0]
         assert "Template with escaping challenges:" in prompt
         # The raw tags should be properly escaped and included literally
         assert "This looks like a Jinja tag but isn't: {% include 'fake_include.jinja' %}" in prompt
@@ -385,20 +326,13 @@ def test_escaping_in_included_content(mock_logger, mock_llm_client, runner, edge
         assert 'Quotes and backslashes: "quoted \\ backslash"' in prompt
 
 @pytest.mark.skip("Test skipped - need to fix parent directory traversal")
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_parent_directory_traversal(mock_logger, mock_llm_client, runner, edge_case_templates):
+def test_parent_directory_traversal(llm_client, runner, edge_case_templates):
     """Test include with parent directory traversal."""
-    # Setup mocks
-    client_instance = Mock()
-    client_instance.query.side_effect = [
+    # Set the mocked client's response
+    llm_client.query.side_effect = [
         "Response from child template",  # First call
         "Response from parent template"   # Second call for the included parent template
     ]
-    mock_llm_client.return_value = client_instance
-    
-    logger_instance = Mock()
-    mock_logger.return_value = logger_instance
     
     # Run CLI command
     with tempfile.TemporaryDirectory() as log_dir:
@@ -415,22 +349,15 @@ def test_parent_directory_traversal(mock_logger, mock_llm_client, runner, edge_c
         assert result.exit_code == 0
         
         # Verify proper calls
-        assert client_instance.query.call_count >= 1
-        first_prompt = client_instance.query.call_args_list[0][0][0]
+        assert llm_client.query.call_count >= 1
+        first_prompt = llm_client.query.call_args_list[0][0][0]
         assert "Child template including parent:" in first_prompt
 
 @pytest.mark.skip("Test skipped - need to fix complex Jinja-like syntax handling")
-@patch('jinja_prompt_chaining_system.parser.LLMClient')
-@patch('jinja_prompt_chaining_system.parser.LLMLogger')
-def test_confusing_jinja_like_syntax(mock_logger, mock_llm_client, runner, edge_case_templates):
+def test_confusing_jinja_like_syntax(llm_client, runner, edge_case_templates):
     """Test template with content that might confuse the parser (code samples with Jinja-like syntax)."""
-    # Setup mocks
-    client_instance = Mock()
-    client_instance.query.return_value = "Response with confusing syntax"
-    mock_llm_client.return_value = client_instance
-    
-    logger_instance = Mock()
-    mock_logger.return_value = logger_instance
+    # Set the mocked client's response
+    llm_client.query.return_value = "Response with confusing syntax"
     
     # Run CLI command
     with tempfile.TemporaryDirectory() as log_dir:
@@ -447,8 +374,8 @@ def test_confusing_jinja_like_syntax(mock_logger, mock_llm_client, runner, edge_
         assert result.exit_code == 0
         
         # Verify confusing syntax was handled properly
-        client_instance.query.assert_called_once()
-        prompt = client_instance.query.call_args[0][0]
+        llm_client.query.assert_called_once()
+        prompt = llm_client.query.call_args[0][0]
         assert "This template has content that might confuse parsing:" in prompt
         assert "Here's a code sample with Jinja-like syntax:" in prompt
         assert 'template = "{% include \'something.html\' %}"' in prompt
@@ -1,45 +1,51 @@
 import os
 import pytest
-import tempfile
 from unittest.mock import patch, Mock
 from jinja_prompt_chaining_system import create_environment
 from jinja_prompt_chaining_system.utils import EnhancedTemplateNotFound
 from jinja2 import TemplateNotFound
 
-@pytest.fixture
-def error_test_dirs():
+# Relative path (under templates/) -> content for every file in the error-message template tree
+ERROR_TEST_TEMPLATES = {
+    # A template with a relative include that doesn't exist
+    "nested/relative_error.jinja": """
+        {% include '../non_existent.jinja' %}
+        """,
+    # A template with an absolute include that doesn't exist
+    "nested/absolute_error.jinja": """
+        {% include 'non_existent.jinja' %}
+        """,
+    # A valid template for reference
+    "valid.jinja": "Valid template content",
+    # A multi-level include situation: level 1 includes level 2...
+    "level1.jinja": """
+        Level 1 template
+        {% include 'nested/level2.jinja' %}
+        """,
+    # ...and level 2 includes a non-existent template with a relative path
+    "nested/level2.jinja": """
+        Level 2 template
+        {% include '../non_existent_nested.jinja' %}
+        """,
+}
+
+@pytest.fixture(scope="session")
+def error_test_dirs(tmp_path_factory):
     """Create a directory structure for testing error messages on includes."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Create a nested directory structure
-        main_dir = tmpdir
-        template_dir = os.path.join(main_dir, "templates")
-        nested_dir = os.path.join(template_dir, "nested")
-        
-        # Create directories
-        os.makedirs(template_dir, exist_ok=True)
-        os.makedirs(nested_dir, exist_ok=True)
-        
-        # Create a template with a relative include that doesn't exist
-        with open(os.path.join(nested_dir, "relative_error.jinja"), "w") as f:
-            f.write("""
-            {% include '../non_existent.jinja' %}
-            """)
-        
-        # Create a template with an absolute include that doesn't exist
-        with open(os.path.join(nested_dir, "absolute_error.jinja"), "w") as f:
-            f.write("""
-            {% include 'non_existent.jinja' %}
-            """)
-            
-        # Create a valid template for reference
-        with open(os.path.join(template_dir, "valid.jinja"), "w") as f:
-            f.write("Valid template content")
-            
-        yield {
-            "main_dir": main_dir,
-            "template_dir": template_dir,
-            "nested_dir": nested_dir
-        }
+    # Create a nested directory structure
+    main_dir = tmp_path_factory.mktemp("error_test_dirs")
+    template_dir = main_dir / "templates"
+    nested_dir = template_dir / "nested"
+    nested_dir.mkdir(parents=True)
+    
+    for rel_path, content in ERROR_TEST_TEMPLATES.items():
+        (template_dir / rel_path).write_text(content)
+    
+    return {
+        "main_dir": str(main_dir),
+        "template_dir": str(template_dir),
+        "nested_dir": str(nested_dir)
+    }
 
 def test_relative_include_error_message(error_test_dirs):
     """Test that relative include errors show absolute paths."""
@@ -75,7 +81,7 @@ def test_relative_include_error_message(error_test_dirs):
     
     # Check attempted_paths list
     assert len(excinfo.value.attempted_paths) > 0
-    assert any("relative to" in path for path in excinfo.value.attempted_paths)
+    assert "relative to" in "\n".join(excinfo.value.attempted_paths)
 
 def test_absolute_include_error_message(error_test_dirs):
     """Test that standard include errors show absolute paths."""
@@ -108,28 +114,10 @@ def test_absolute_include_error_message(error_test_dirs):
     
     # Check attempted_paths list
     assert len(excinfo.value.attempted_paths) > 0
-    assert any("from searchpath" in path for path in excinfo.value.attempted_paths)
+    assert "from searchpath" in "\n".join(excinfo.value.attempted_paths)
 
 def test_deeply_nested_include_error_messages(error_test_dirs):
     """Test that errors with multiple levels of includes show full chain."""
-    # Create a multi-level include situation
-    level1_path = os.path.join(error_test_dirs["template_dir"], "level1.jinja")
-    level2_path = os.path.join(error_test_dirs["nested_dir"], "level2.jinja")
-    
-    # Level 1 includes level 2
-    with open(level1_path, "w") as f:
-        f.write("""
-        Level 1 template
-        {% include 'nested/level2.jinja' %}
-        """)
-    
-    # Level 2 includes non-existent with relative path
-    with open(level2_path, "w") as f:
-        f.write("""
-        Level 2 template
-        {% include '../non_existent_nested.jinja' %}
-        """)
-    
     # Create environment with template directory as template path
     env = create_environment(error_test_dirs["template_dir"])
     
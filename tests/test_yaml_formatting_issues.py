@@ -16,8 +16,6 @@ def logger(log_dir):
 
 def test_huge_formatted_content_logging(logger, log_dir):
     """Test YAML formatting with very large content field."""
-    from jinja_prompt_chaining_system.logger import preprocess_yaml_data
-    
     # Create a test template name
     template_name = "test_huge_content"
     
@@ -178,7 +176,6 @@ def test_direct_yaml_dumper_with_large_content():
         assert "<AboutComplexityProcessing>" in reloaded_data["request"]["messages"][0]["content"]
         
         # Now run the post-processing step manually to see its effect
-        from jinja_prompt_chaining_system.logger import LLMLogger
         dummy_logger = LLMLogger()
         dummy_logger._post_process_yaml_file(temp_file_path)
         